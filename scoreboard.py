@@ -21,56 +21,220 @@ Usage
         f.write(b64_leaderboard)
 """
 from PIL import Image, ImageDraw, ImageFont
-from io import BytesIO
 from abc import ABC, abstractmethod
-import base64
+from functools import lru_cache
+from operator import itemgetter
+import math
+
+try:
+    import pyvips
+except ImportError:
+    pyvips = None
 
 # Type alias for RGBA colors
 Color = tuple[float, float, float, float]
 
+# Default colors shared by the scoreboards
+_DEFAULT_FILL: Color = (255, 249, 251, 0)
+_DEFAULT_TEXT_COLOR: Color = (65, 101, 138, 255)
+_DEFAULT_ACCENT_COLOR: Color = (102, 143, 183, 255)
+
+
+def _to_rgba(color: Color) -> tuple[int, int, int, int]:
+    """Resolve any color Pillow accepts (tuple, int or string) to the RGBA tuple it draws with."""
+    return Image.new("RGBA", (1, 1), color).getpixel((0, 0))
+
+def _font_options(font: ImageFont.FreeTypeFont) -> tuple[int, str, int]:
+    """The index, encoding and layout engine of `font`, which `_get_font` needs to recreate it at another size."""
+    return font.index, font.encoding, font.layout_engine
+
+@lru_cache(maxsize=64)
+def _get_font(path: str, size: int, index: int = 0, encoding: str = "", layout_engine: int = None) -> ImageFont.FreeTypeFont:
+    """Load a TrueType font, reusing previously loaded faces. Arguments are the same as `ImageFont.truetype`."""
+    return ImageFont.truetype(path, size, index, encoding, layout_engine)
+
+@lru_cache(maxsize=4096)
+def _measure(path: str, size: int, text: str, *options) -> float:
+    """Rendered length of `text` in pixels, cached per font and size.
+
+    `options` are the font's index, encoding and layout engine, as passed to `_get_font`.
+    """
+    return _get_font(path, size, *options).getlength(text)
+
+@lru_cache(maxsize=512)
+def _text_mask(path: str, size: int, text: str, anchor: str, *options) -> tuple[Image.Image, tuple[int, int]]:
+    """Rasterized alpha mask of single-line `text` and its offset from the anchor point, cached per font and size."""
+    font = _get_font(path, size, *options)
+    left, top, right, bottom = font.getbbox(text, anchor=anchor)
+    mask = Image.new("L", (right - left, bottom - top), 0)
+    ImageDraw.Draw(mask).text((-left, -top), text, fill=255, font=font, anchor=anchor)
+    return mask, (left, top)
+
+@lru_cache(maxsize=1024)
+def _fit_font_size(path: str, size: int, text: str, max_length: float, *options) -> int:
+    """Largest font size <= `size` at which `text` fits in `max_length` (minimum 1).
+
+    Text width grows monotonically with font size, so a binary search is used.
+    Results are cached on the font's path and options rather than the font object
+    itself, and each probed size goes through the shared font cache.
+    """
+    if _measure(path, size, text, *options) <= max_length:
+        return size
+
+    lo, hi = 1, size - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if _measure(path, mid, text, *options) <= max_length:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
 class Scoreboard(ABC):
     """Base class for scoreboard creation. Use a child class to define its behaviour."""
 
+    def __setattr__(self, name, value):
+        # Changing any setting invalidates the previously rendered image
+        if name not in ("_image_cache", "_image_key"):
+            super().__setattr__("_image_cache", None)
+        super().__setattr__(name, value)
+
     @property
     def image(self) -> Image:
-        return self._generate_image()
+        """The rendered scoreboard.
 
-    def b64_image(self) -> bytes:
+        Each access returns a new RGBA copy, so drawing on it doesn't affect later saved images.
+        """
+        image = self._rendered()
+        # Opaque scoreboards are rendered without an alpha channel
+        if image.mode != "RGBA":
+            return image.convert("RGBA")
+        return image.copy()
+
+    def _rendered(self) -> Image:
+        """The rendered scoreboard, reused until an attribute is reassigned or its entries change."""
+        key = self._render_key()
+        if getattr(self, "_image_cache", None) is None or key != self._image_key:
+            self._image_cache = self._generate_image()
+            self._image_key = key
+        return self._image_cache
+
+    def _render_key(self):
+        """Snapshot of state that can change without an attribute being reassigned,
+        such as lists modified in place. The image is re-rendered when it changes."""
+        return None
+
+    def _vips_image(self) -> "pyvips.Image":
+        """The rendered scoreboard as a libvips image, for encoding with the vips backend."""
+        if pyvips is None:
+            raise ImportError("backend='vips' requires pyvips to be installed")
+
+        image = self._rendered()
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        return pyvips.Image.new_from_memory(image.tobytes(), image.width, image.height, len(image.mode), "uchar")
+
+    @classmethod
+    def _check_backend(cls, backend: str):
+        if backend not in ("pillow", "vips"):
+            raise ValueError(f"Unknown backend '{backend}', expected 'pillow' or 'vips'")
+
+    def b64_image(self, compress_level: int = 1, backend: str = "pillow") -> bytes:
         """Generate the image and encode in base64
         
+        Params
+        ------
+            compress_level:
+                zlib compression level of the PNG, from 0 (none) to 9 (smallest, slowest).
+            backend:
+                PNG encoder to use, "pillow" or "vips". "vips" requires pyvips and is faster for bulk generation.
 
         Returns
         -------
             Base64 encoded image data in bytes
         """
-        buffer = BytesIO()
-        self.image.save(buffer, "PNG")   
-        im_b64 = base64.b64encode(buffer.getvalue())
-        im_b64 = b"data:image/png;base64," + im_b64
-        return im_b64
+        # Imported here since most callers only save images to disk
+        from io import BytesIO
+        import base64
 
-    def save_image(self, file_name: str):
+        Scoreboard._check_backend(backend)
+        if backend == "vips":
+            png = self._vips_image().pngsave_buffer(compression=compress_level)
+        else:
+            buffer = BytesIO()
+            self._rendered().save(buffer, "PNG", compress_level=compress_level)
+            # A view of the buffer avoids copying the PNG data before encoding it
+            png = buffer.getbuffer()
+
+        # Encode in chunks straight after the prefix, so neither the full base64 output
+        # nor the prefixed result is held as a second copy. The chunk size is a multiple
+        # of 3 so no padding appears mid-stream, and getvalue() returns the buffer as is
+        png = memoryview(png)
+        im_b64 = BytesIO()
+        im_b64.write(b"data:image/png;base64,")
+        chunk_size = 3 * 64 * 1024
+        for i in range(0, len(png), chunk_size):
+            im_b64.write(base64.b64encode(png[i:i + chunk_size]))
+        return im_b64.getvalue()
+
+    def save_image(self, file_name: str, compress_level: int = 1, backend: str = "pillow"):
         """Save the image to a file
         
         Params
         ------
             file_name:
                 Name of the file. The file is saved as .png and other extensions will be ignored.
+                Fully opaque scoreboards are saved without an alpha channel.
+            compress_level:
+                zlib compression level of the PNG, from 0 (none) to 9 (smallest, slowest).
+                Scoreboards are mostly flat color, so low levels are much faster at little cost in size.
+            backend:
+                PNG encoder to use, "pillow" or "vips". "vips" requires pyvips and is faster for bulk generation.
         """
+        Scoreboard._check_backend(backend)
         if not file_name.endswith(".png"):
             file_name += ".png"
-        self.image.save(file_name)
+        if backend == "vips":
+            self._vips_image().pngsave(file_name, compression=compress_level)
+        else:
+            self._rendered().save(file_name, format="PNG", compress_level=compress_level)
     
     @classmethod
     def fit_text_to_length(cls, text: str, font: ImageFont, max_length: int) -> ImageFont:
-        font_size = font.size
-        
-        
-        while font.getlength(text) > max_length and font_size > 1:
-            font_size -= 1
-            font = font.font_variant(size=font_size)
-        
-        return font
+        # Keep the font's face index, encoding and layout engine, like font_variant does
+        options = _font_options(font)
+        font_size = _fit_font_size(font.path, font.size, text, max_length, *options)
+        if font_size == font.size:
+            return font
+        return _get_font(font.path, font_size, *options)
+
+    @classmethod
+    def _draw_text(cls, image: Image, xy: tuple[float, float], text: str, font: ImageFont, fill: Color, anchor: str):
+        """Equivalent to ImageDraw.text, but reuses cached glyph masks instead of rasterizing each time."""
+        # Masks are sized for a single line, so leave multiline layout to ImageDraw
+        if "\n" in text:
+            ImageDraw.Draw(image).text(xy, text, font=font, fill=fill, anchor=anchor)
+            return
+
+        mask, offset = _text_mask(font.path, font.size, text, anchor, *_font_options(font))
+        # ImageDraw truncates the final coordinates to ints in the same way
+        image.paste(fill, (int(xy[0] + offset[0]), int(xy[1] + offset[1])), mask)
+
+    @classmethod
+    def _new_canvas(cls, size: tuple[int, int], fill_color: Color, *colors: Color) -> Image:
+        """Create the background image, given the colors that will be drawn on it."""
+        fill_rgba, *colors_rgba = (_to_rgba(c) for c in (fill_color, *colors))
+
+        # Without any transparency there's no need for an alpha channel, and an RGB
+        # image is a quarter smaller to draw on and encode
+        if all(c[3] == 255 for c in (fill_rgba, *colors_rgba)):
+            return Image.new("RGB", size, fill_rgba[:3])
+
+        # A fully transparent background looks the same whatever its RGB values, and
+        # Pillow creates zero-filled images much faster than filling in a color
+        if fill_rgba[3] == 0:
+            return Image.new("RGBA", size, 0)
+        return Image.new("RGBA", size, fill_color)
 
     @abstractmethod
     def _generate_image(self) -> Image:
@@ -93,9 +257,9 @@ class Leaderboard(Scoreboard):
     def __init__(
             self,
             ranking: list[tuple[str, float]],
-            fill_color: Color = (255, 249, 251, 0),
-            text_color: Color = (65, 101, 138, 255),
-            text_color_alternate: Color = (102, 143, 183, 255),
+            fill_color: Color = _DEFAULT_FILL,
+            text_color: Color = _DEFAULT_TEXT_COLOR,
+            text_color_alternate: Color = _DEFAULT_ACCENT_COLOR,
             seperator: bool = True,
             seperator_color: Color = (106, 107, 120),
             seperator_width: int = 5,
@@ -134,19 +298,41 @@ class Leaderboard(Scoreboard):
     def ranking(self):
         return self._ranking
 
+    def _render_key(self):
+        return tuple(map(tuple, self.ranking))
+
     @ranking.setter
     def ranking(self, value: list[tuple[str, float]]):
-        value.sort(key=lambda player: player[1], reverse=True)
+        value.sort(key=itemgetter(1), reverse=True)
         self._ranking = value
 
+    def _layout_rows(self, width: int, margin_top: float) -> list[tuple[float, str, str, float, float]]:
+        """Compute the layout of every row before anything is drawn.
+
+        Returns
+        -------
+            A (baseline y, number text, score text, name x, max name length) tuple per row
+        """
+        row_height = self.font_size + self.line_spacing
+        rows = []
+        for i, entry in enumerate(self.ranking):
+            # Number and score are padded with spaces to seperate them from the name
+            numberText = f"{i+1}  "
+            scoreText = " " +str(entry[1])
+            numberTextLength = _measure(self.font_file, self.font_size, numberText)
+            scoreTextLength = _measure(self.font_file, self.font_size, scoreText)
+            maxLength = width - self.margin_left - self.margin_right - numberTextLength - scoreTextLength
+            rows.append((margin_top + i*row_height, numberText, scoreText, self.margin_left + numberTextLength, maxLength))
+        return rows
+
     def _generate_image(self) -> Image:
-        font = ImageFont.truetype(self.font_file, self.font_size)
-        font_bold = ImageFont.truetype(self.font_file_bold, self.font_size)
+        font = _get_font(self.font_file, self.font_size)
+        font_bold = _get_font(self.font_file_bold, self.font_size)
 
         # Add font_size to margin top due to anchor of text being at baseline
         # also increase margin for when there's a title
         if self.title:
-            title_font = font_bold.font_variant(size=self.title_font_size)
+            title_font = _get_font(self.font_file_bold, self.title_font_size)
             adjusted_margin_top = self.margin_top + self.title_font_size
             titleMarginTop = adjusted_margin_top
             adjusted_margin_top += title_font.getsize(self.title)[1]
@@ -155,12 +341,13 @@ class Leaderboard(Scoreboard):
 
         width = 800
         img_size = (width, adjusted_margin_top + self.margin_bot + (len(self.ranking)-1) * (self.font_size + self.line_spacing) + self.line_spacing)
-        image = Image.new("RGBA", img_size, self.fill_color)
+        image = Scoreboard._new_canvas(img_size, self.fill_color, self.text_color, self.text_color_alternate, self.seperator_color)
         draw = ImageDraw.Draw(image)
         
 
         if self.title:
-            draw.text(
+            Scoreboard._draw_text(
+                image,
                 (img_size[0]/2, titleMarginTop),
                 self.title,
                 font=title_font,
@@ -168,24 +355,41 @@ class Leaderboard(Scoreboard):
                 anchor="ms"
             )
 
-        for i, entry in enumerate(self.ranking):
-            color = [self.text_color, self.text_color_alternate][i%2]
-
-            # Number
-            numberText = f"{i+1}  "
-            draw.text(
-                (self.margin_left, adjusted_margin_top + i*(self.font_size + self.line_spacing)),
-                numberText,
+        # Baselines of each row and the seperators above them, plus one below the last row.
+        # Seperators are drawn as filled rectangles covering the same pixels as a
+        # horizontal line of seperator_width, which is cheaper than draw.line
+        row_height = self.font_size + self.line_spacing
+        rows = self._layout_rows(img_size[0], adjusted_margin_top)
+        row_ys = [row[0] for row in rows]
+        if self.seperator:
+            seperator_ys = [y - 0.75*row_height for y in row_ys] + [row_ys[-1] + 0.25*row_height]
+            # draw.line draws widths below 1 as a 1px line
+            seperator_width = max(self.seperator_width, 1)
+            seperator_boxes = []
+            for y in seperator_ys:
+                top = math.floor(y) - (seperator_width - 1)//2
+                seperator_boxes.append((self.margin_left, top, img_size[0] - self.margin_right, top + seperator_width - 1))
+
+        colors = (self.text_color, self.text_color_alternate)
+        for i, (entry, (y, numberText, scoreText, nameX, maxLength)) in enumerate(zip(self.ranking, rows)):
+            color = colors[i & 1]
+
+            # Number and score are drawn without their padding so it isn't
+            # shaped and rasterized
+            Scoreboard._draw_text(
+                image,
+                (self.margin_left, y),
+                numberText.rstrip(),
                 font=font,
                 fill=color,
                 anchor="ls"
             )
 
             # Score
-            scoreText = " " +str(entry[1])
-            draw.text(
-                (img_size[0] - self.margin_right, adjusted_margin_top + i*(self.font_size+self.line_spacing)),
-                scoreText,
+            Scoreboard._draw_text(
+                image,
+                (img_size[0] - self.margin_right, y),
+                scoreText.lstrip(),
                 font=font,
                 fill=color,
                 anchor="rs"
@@ -193,14 +397,11 @@ class Leaderboard(Scoreboard):
 
             # Name
             nameText = entry[0]
-            numberTextLength = font.getlength(numberText)
-            scoreTextLength = font.getlength(scoreText)
-            maxLength = img_size[0] - self.margin_left - self.margin_right - numberTextLength - scoreTextLength
-            
             nameFont = Leaderboard.fit_text_to_length(nameText, font_bold, maxLength)
 
-            draw.text(
-                (self.margin_left + numberTextLength, adjusted_margin_top + i*(self.font_size+self.line_spacing)),
+            Scoreboard._draw_text(
+                image,
+                (nameX, y),
                 nameText,
                 font=nameFont,
                 fill=color,
@@ -209,25 +410,11 @@ class Leaderboard(Scoreboard):
 
             # Seperator
             if self.seperator:
-                draw.line(
-                    [
-                        (self.margin_left, adjusted_margin_top + (i-0.75)*(self.font_size+self.line_spacing)),
-                        (img_size[0] - self.margin_right, adjusted_margin_top + (i-0.75)*(self.font_size+self.line_spacing))
-                    ],
-                    fill=self.seperator_color,
-                    width=self.seperator_width
-                )
+                draw.rectangle(seperator_boxes[i], fill=self.seperator_color)
 
         # Extra seperator at end
         if self.seperator:
-                draw.line(
-                    [
-                        (self.margin_left, adjusted_margin_top + (i+0.25)*(self.font_size+self.line_spacing)),
-                        (img_size[0] - self.margin_right, adjusted_margin_top + (i+0.25)*(self.font_size+self.line_spacing))
-                    ],
-                    fill=self.seperator_color,
-                    width=self.seperator_width
-                )
+            draw.rectangle(seperator_boxes[-1], fill=self.seperator_color)
 
         return image
 
@@ -248,9 +435,9 @@ class Head2Head(Scoreboard):
     def __init__(
             self,
             teams: list[tuple[str, float]],
-            fill_color: Color = (255, 249, 251, 0),
-            text_color: Color = (65, 101, 138, 255),
-            score_color: Color = (102, 143, 183, 255),
+            fill_color: Color = _DEFAULT_FILL,
+            text_color: Color = _DEFAULT_TEXT_COLOR,
+            score_color: Color = _DEFAULT_ACCENT_COLOR,
             font_file: str = "open-sans/OpenSans-Regular.ttf",
             font_file_bold: str = "open-sans/OpenSans-Bold.ttf",
             font_size: int = 72,
@@ -260,7 +447,7 @@ class Head2Head(Scoreboard):
             margin_sides: int = 50,
             rectangle: bool = True,
             rectangle_margin: int = 50,
-            rectangle_color: Color = (102, 143, 183, 255)
+            rectangle_color: Color = _DEFAULT_ACCENT_COLOR
         ):
 
         super().__init__()
@@ -279,26 +466,30 @@ class Head2Head(Scoreboard):
         self.rectangle_margin = rectangle_margin
         self.rectangle_color = rectangle_color
 
+    def _render_key(self):
+        return tuple(map(tuple, self.teams))
+
     def _generate_image(self) -> Image:
 
-        score_font = ImageFont.truetype(self.font_file, self.score_font_size)
-        team_font = ImageFont.truetype(self.font_file_bold, self.font_size)
+        score_font = _get_font(self.font_file, self.score_font_size)
+        team_font = _get_font(self.font_file_bold, self.font_size)
         if self.title:
-            title_font = ImageFont.truetype(self.font_file_bold, self.title_font_size)
+            title_font = _get_font(self.font_file_bold, self.title_font_size)
 
         component_size = [0, 500]
         for team in self.teams:
-            name_length = int(team_font.getlength(team[0])) + self.margin_sides
+            name_length = int(_measure(self.font_file_bold, self.font_size, team[0])) + self.margin_sides
             if name_length > component_size[0]:
                 component_size[0] = name_length
 
 
         img_size = (component_size[0] * len(self.teams), component_size[1])
-        image = Image.new("RGBA", img_size, self.fill_color)
+        image = Scoreboard._new_canvas(img_size, self.fill_color, self.text_color, self.score_color, self.rectangle_color)
         draw = ImageDraw.Draw(image)
 
         if self.title:
-            draw.text(
+            Scoreboard._draw_text(
+                image,
                 (img_size[0]/2, img_size[1]/5),
                 self.title,
                 font=title_font,
@@ -309,7 +500,8 @@ class Head2Head(Scoreboard):
         x_spacing = float(img_size[0]) / len(self.teams)
         for i, team in enumerate(self.teams):
             x_coord = x_spacing/2 + i*x_spacing
-            draw.text(
+            Scoreboard._draw_text(
+                image,
                 (x_coord, component_size[1] / (3 if self.title else 4)),
                 team[0],
                 font=team_font,
@@ -317,20 +509,22 @@ class Head2Head(Scoreboard):
                 fill=self.text_color
             )
 
+            score_text = str(team[1])
             score_margin = self.margin_sides + self.rectangle_margin if self.rectangle else self.margin_sides
-            adjusted_score_font = Scoreboard.fit_text_to_length(str(team[1]), score_font, component_size[1] - score_margin)
+            adjusted_score_font = Scoreboard.fit_text_to_length(score_text, score_font, component_size[1] - score_margin)
 
             score_coords = (x_coord, component_size[1] * 2 / 3) # Center of score str & bounding rectangle
-            draw.text(
+            Scoreboard._draw_text(
+                image,
                 score_coords,
-                str(team[1]),
+                score_text,
                 font=adjusted_score_font,
                 anchor='mm',
                 fill=self.score_color
             )
-            bbox = adjusted_score_font.getbbox(str(team[1]),anchor='mm')
 
             if self.rectangle:
+                bbox = adjusted_score_font.getbbox(score_text, anchor='mm')
                 draw.rounded_rectangle(
                     (bbox[0]+score_coords[0] - self.rectangle_margin, bbox[1]+score_coords[1] - self.rectangle_margin,
                     bbox[2]+score_coords[0] + self.rectangle_margin, bbox[3]+score_coords[1] + self.rectangle_margin),